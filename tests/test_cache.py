@@ -0,0 +1,116 @@
+"""Tests for the transcript cache"""
+
+import wave
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from wyoming_universal_stt.cache import CacheKey, TranscriptCache
+
+_DIR = Path(__file__).parent
+
+
+def _load_audio() -> np.ndarray:
+    """Load the test WAV as 16Khz mono float32 (naive downsample)."""
+    with wave.open(str(_DIR / "turn_on_the_living_room_lamp.wav"), "rb") as wav_file:
+        assert wav_file.getsampwidth() == 2
+        pcm = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+        channels = wav_file.getnchannels()
+        rate = wav_file.getframerate()
+
+    audio = pcm.reshape(-1, channels).mean(axis=1) / 32768.0
+    positions = np.arange(0, len(audio), rate / 16000)
+    return np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+
+def _to_pcm(audio: np.ndarray) -> bytes:
+    return (audio * 32767).astype(np.int16).tobytes()
+
+
+def _lookup(
+    cache: TranscriptCache, audio: np.ndarray, language: Optional[str]
+) -> Tuple[CacheKey, Optional[str]]:
+    """Look up audio like the event handler does."""
+    key = cache.make_key(_to_pcm(audio), language)
+    text = cache.get(key)
+    if text is None:
+        text = cache.get_similar(key, audio)
+
+    return key, text
+
+
+def test_exact_hit() -> None:
+    cache = TranscriptCache(similarity=0)
+    audio = _load_audio()
+
+    key, text = _lookup(cache, audio, "en")
+    assert text is None
+
+    cache.put(key, "turn on the living room lamp")
+    assert cache.get(key) == "turn on the living room lamp"
+
+    # Language is part of the key
+    assert _lookup(cache, audio, "de")[1] is None
+
+
+def test_approximate_hit() -> None:
+    cache = TranscriptCache(similarity=0.95)
+    audio = _load_audio()
+    key, text = _lookup(cache, audio, "en")
+    assert text is None
+    cache.put(key, "lamp")
+
+    # Quieter with extra silence
+    silence = np.zeros(8000, dtype=np.float32)
+    similar = np.concatenate([silence, audio * 0.5, silence])
+    assert _lookup(cache, similar, "en")[1] == "lamp"
+
+    # Approximate matches are per language
+    assert _lookup(cache, similar, "de")[1] is None
+
+    # Different audio
+    different = np.ascontiguousarray(audio[::-1])
+    assert _lookup(cache, different, "en")[1] is None
+
+
+def test_approximate_near_miss() -> None:
+    cache = TranscriptCache(similarity=0.95)
+    audio = _load_audio()
+    key, text = _lookup(cache, audio, "en")
+    assert text is None
+    cache.put(key, "lamp")
+
+    voiced = np.flatnonzero(np.abs(audio) > 0.05 * np.abs(audio).max())
+    start, end = voiced[0], voiced[-1] + 1
+
+    # Broadband noise like an "s" (150 ms)
+    rng = np.random.default_rng(0)
+    fricative = np.diff(rng.standard_normal(2400), prepend=0.0)
+    fricative = (fricative / np.abs(fricative).max()) * 0.4 * np.abs(audio).max()
+    fricative = fricative.astype(np.float32)
+
+    near_misses = [
+        # "lamps"
+        np.concatenate([audio[:end], fricative, audio[end:]]),
+        # "slamp"
+        np.concatenate([audio[:start], fricative, audio[start:]]),
+        # Last 200 ms cut off
+        np.concatenate([audio[: end - 3200], audio[end:]]),
+    ]
+    for near_miss in near_misses:
+        assert _lookup(cache, near_miss, "en")[1] is None
+
+
+def test_eviction() -> None:
+    cache = TranscriptCache(max_size=2, similarity=0)
+    keys = []
+    for i in range(3):
+        audio = np.full(1600, i / 10, dtype=np.float32)
+        key = cache.make_key(_to_pcm(audio), None)
+        cache.put(key, str(i))
+        keys.append(key)
+
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[1]) == "1"
+    assert cache.get(keys[2]) == "2"
@@ -0,0 +1,45 @@
+"""Tests for log-Mel spectrogram features"""
+
+import numpy as np
+import pytest
+from faster_whisper.feature_extractor import FeatureExtractor
+
+from wyoming_universal_stt.features import (
+    SAMPLE_RATE,
+    log_mel_spectrogram,
+    torch_mel_tensors,
+)
+
+
+def _make_audio() -> np.ndarray:
+    """3 seconds of a rising tone with noise."""
+    rng = np.random.default_rng(0)
+    t = np.arange(3 * SAMPLE_RATE) / SAMPLE_RATE
+    tone = 0.5 * np.sin(2 * np.pi * (200 + 500 * t) * t)
+    return (tone + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def test_matches_faster_whisper() -> None:
+    audio = _make_audio()
+    expected = FeatureExtractor()(audio)
+
+    actual = log_mel_spectrogram(audio, padding=160)
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, atol=1e-6)
+
+
+def test_torch_matches_numpy() -> None:
+    pytest.importorskip("torch")
+    audio = _make_audio()
+    expected = log_mel_spectrogram(audio, padding=160)
+
+    actual = log_mel_spectrogram(audio, padding=160, device="cpu")
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+
+    # Prebuilt tensors give the same result
+    tensors = torch_mel_tensors(80, "cpu")
+    cached = log_mel_spectrogram(
+        audio, padding=160, device="cpu", torch_tensors=tensors
+    )
+    np.testing.assert_array_equal(cached, actual)
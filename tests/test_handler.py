@@ -0,0 +1,227 @@
+"""Tests for the event handler using fake backends"""
+
+import argparse
+import asyncio
+import io
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Any, Iterable, List, NamedTuple
+
+import pytest
+from wyoming.asr import Transcript
+from wyoming.audio import AudioStop, wav_to_chunks
+from wyoming.event import read_event
+from wyoming.info import Attribution, Info
+
+from wyoming_universal_stt.backends import WhisperBackend
+from wyoming_universal_stt.handler import WhisperEventHandler
+
+_DIR = Path(__file__).parent
+_SAMPLES_PER_CHUNK = 1024
+
+
+class Segment(NamedTuple):
+    text: str
+
+
+class FakeBackend(WhisperBackend):
+    """Returns fixed segments, optionally failing after some of them."""
+
+    supports_streaming = True
+    thread_safe = True
+
+    def __init__(self, model_name: str = "fake", **kwargs):
+        self.texts: List[str] = kwargs.get("texts", [" turn on", "  ", " the lamp"])
+        self.fail_after = kwargs.get("fail_after")
+
+    def transcribe(self, audio: Any, **kwargs) -> Iterable[Any]:
+        segments = self._segments()
+        if kwargs.get("drain", True):
+            return list(segments)
+
+        return segments
+
+    def _segments(self) -> Iterable[Segment]:
+        for i, text in enumerate(self.texts):
+            if i == self.fail_after:
+                raise RuntimeError("Decoding failed")
+
+            yield Segment(text)
+
+    def get_supported_languages(self) -> list[str]:
+        return ["en"]
+
+    def get_version(self) -> str:
+        return "1.0"
+
+    def get_attribution(self) -> Attribution:
+        return Attribution(name="", url="")
+
+
+class NonStreamingBackend(FakeBackend):
+    supports_streaming = False
+
+
+class BlockingBackend(NonStreamingBackend):
+    """Blocks in transcribe() until released."""
+
+    def __init__(self, model_name: str = "fake", **kwargs):
+        super().__init__(model_name, **kwargs)
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.finished = threading.Event()
+
+    def transcribe(self, audio: Any, **kwargs) -> Iterable[Any]:
+        self.started.set()
+        self.release.wait(timeout=10)
+        self.finished.set()
+        return super().transcribe(audio, **kwargs)
+
+
+class CountingBackend(NonStreamingBackend):
+    """Records how many transcriptions run at once across instances."""
+
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def transcribe(self, audio: Any, **kwargs) -> Iterable[Any]:
+        with CountingBackend.lock:
+            CountingBackend.running += 1
+            CountingBackend.max_running = max(
+                CountingBackend.max_running, CountingBackend.running
+            )
+
+        time.sleep(0.1)
+
+        with CountingBackend.lock:
+            CountingBackend.running -= 1
+
+        return super().transcribe(audio, **kwargs)
+
+
+class FakeWriter:
+    """Collects the bytes written by the handler."""
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+
+    def write(self, data: bytes) -> None:
+        self.buffer.extend(data)
+
+    def writelines(self, lines: Iterable[bytes]) -> None:
+        for line in lines:
+            self.buffer.extend(line)
+
+    async def drain(self) -> None:
+        pass
+
+    def transcripts(self) -> List[str]:
+        texts = []
+        with io.BytesIO(bytes(self.buffer)) as events_io:
+            while (event := read_event(events_io)) is not None:
+                if Transcript.is_type(event.type):
+                    texts.append(Transcript.from_event(event).text)
+
+        return texts
+
+
+def _make_pool(*backends: WhisperBackend) -> "asyncio.Queue[WhisperBackend]":
+    backend_pool: "asyncio.Queue[WhisperBackend]" = asyncio.Queue()
+    for backend in backends:
+        backend_pool.put_nowait(backend)
+
+    return backend_pool
+
+
+def _make_handler(
+    backend_pool: "asyncio.Queue[WhisperBackend]",
+    writer: FakeWriter,
+    stream: bool = False,
+) -> WhisperEventHandler:
+    cli_args = argparse.Namespace(language="en", beam_size=1, stream=stream)
+
+    return WhisperEventHandler(Info(), cli_args, backend_pool, None, writer)
+
+
+async def _send_audio(handler: WhisperEventHandler) -> None:
+    with wave.open(str(_DIR / "turn_on_the_living_room_lamp.wav"), "rb") as example_wav:
+        for chunk in wav_to_chunks(example_wav, _SAMPLES_PER_CHUNK):
+            await handler.handle_event(chunk.event())
+
+    await handler.handle_event(AudioStop().event())
+
+
+async def test_stream_transcript_per_segment() -> None:
+    writer = FakeWriter()
+    handler = _make_handler(_make_pool(FakeBackend()), writer, stream=True)
+    await _send_audio(handler)
+
+    # Empty segments are skipped and there's no final transcript
+    assert writer.transcripts() == ["turn on", "the lamp"]
+
+
+async def test_stream_backend_failure() -> None:
+    writer = FakeWriter()
+    backend = FakeBackend(fail_after=1)
+    handler = _make_handler(_make_pool(backend), writer, stream=True)
+    await _send_audio(handler)
+
+    # No empty transcript after the partial one
+    assert writer.transcripts() == ["turn on"]
+
+
+async def test_stream_unsupported_backend() -> None:
+    writer = FakeWriter()
+    handler = _make_handler(_make_pool(NonStreamingBackend()), writer, stream=True)
+    await _send_audio(handler)
+
+    assert writer.transcripts() == ["turn on the lamp"]
+
+
+async def test_no_stream() -> None:
+    writer = FakeWriter()
+    handler = _make_handler(_make_pool(FakeBackend()), writer, stream=False)
+    await _send_audio(handler)
+
+    assert writer.transcripts() == ["turn on the lamp"]
+
+
+async def test_cancel_keeps_busy_backend() -> None:
+    backend = BlockingBackend()
+    backend_pool = _make_pool(backend)
+    handler = _make_handler(backend_pool, FakeWriter())
+    request = asyncio.create_task(_send_audio(handler))
+    assert await asyncio.to_thread(backend.started.wait, 10)
+
+    request.cancel()
+    await asyncio.sleep(0.1)
+
+    # Still decoding in its worker thread
+    assert backend_pool.empty()
+
+    backend.release.set()
+    with pytest.raises(asyncio.CancelledError):
+        await request
+
+    assert backend.finished.is_set()
+    assert backend_pool.get_nowait() is backend
+
+
+async def test_backend_pool() -> None:
+    backends = [CountingBackend(), CountingBackend()]
+    backend_pool = _make_pool(*backends)
+    writers = [FakeWriter() for _ in range(4)]
+
+    await asyncio.gather(
+        *(_send_audio(_make_handler(backend_pool, writer)) for writer in writers)
+    )
+
+    # Requests ran in parallel, but never more than the pool size
+    assert CountingBackend.max_running == len(backends)
+    assert all(writer.transcripts() == ["turn on the lamp"] for writer in writers)
+
+    # All backends were returned
+    assert backend_pool.qsize() == len(backends)
@@ -6,18 +6,29 @@ import argparse
 import asyncio
 import logging
 import platform
-import re
 from functools import partial
 
 from wyoming.info import AsrModel, AsrProgram, Info
 from wyoming.server import AsyncServer
 
 from wyoming_universal_stt import __version__
-from wyoming_universal_stt.handler import WhisperEventHandler
-from wyoming_universal_stt.backends import WhisperBackendFactory, detect_optimal_backend
+from wyoming_universal_stt.cache import TranscriptCache
+from wyoming_universal_stt.handler import WhisperEventHandler, serialize_event
+from wyoming_universal_stt.backends import (
+    WhisperBackend,
+    WhisperBackendFactory,
+    detect_optimal_backend,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# rhasspy's int8 faster-whisper models, e.g. tiny-int8 or tiny.int8
+_FASTER_WHISPER_MODELS = {
+    f"{size}{sep}int8": f"{size}-int8"
+    for size in ("tiny", "base", "small", "medium")
+    for sep in ("-", ".")
+}
+
 
 async def main() -> None:
     """Main entry point."""
@@ -56,7 +67,7 @@ async def main() -> None:
     parser.add_argument(
         "--compute-type",
         default="default",
-        help="Compute type (float16, int8, etc., ignored for MLX)",
+        help="Compute type (float16, int8, etc., default: int8_float16 on CUDA and int8 otherwise, ignored for MLX)",
     )
     parser.add_argument(
         "--beam-size",
@@ -68,6 +79,57 @@ async def main() -> None:
         "--initial-prompt",
         help="Optional text to provide as a prompt for the first window",
     )
+    parser.add_argument(
+        "--vad-filter",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Skip silent audio with voice activity detection (default: on, faster-whisper only)",
+    )
+    parser.add_argument(
+        "--condition-on-previous-text",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Use previous output as a prompt for the next window (default: off, faster-whisper only)",
+    )
+    parser.add_argument(
+        "--torch-features",
+        action="store_true",
+        help="Compute log-Mel spectrograms with torch on the CUDA device (requires torch, faster-whisper only)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Send a transcript for each segment as it's decoded instead of one at the end (faster-whisper only)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Number of backend instances for transcribing in parallel (default: 2, or 1 for MLX)",
+    )
+    parser.add_argument(
+        "--cpu-threads",
+        type=int,
+        default=0,
+        help="CPU threads per worker (default: 0 for OMP_NUM_THREADS or all available CPUs, divided by --num-workers if set, faster-whisper only)",
+    )
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=0,
+        help="Model workers for parallel decoding (default: 0 for --concurrency, faster-whisper only)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        help="Number of transcripts to cache for repeated audio (0 to disable)",
+    )
+    parser.add_argument(
+        "--cache-similarity",
+        type=float,
+        default=0.0,
+        help="Minimum fingerprint similarity for approximate cache hits, e.g. 0.95 (default: 0 for exact matches only)",
+    )
     parser.add_argument("--debug", action="store_true", help="Log DEBUG messages")
     parser.add_argument(
         "--log-format", default=logging.BASIC_FORMAT, help="Format for log messages"
@@ -98,7 +160,7 @@ async def main() -> None:
     is_arm = ("arm" in machine) or ("aarch" in machine)
     if args.model == "auto":
         if args.backend == "mlx-whisper":
-            args.model = "mlx-community/whisper-tiny-mlx"
+            args.model = "mlx-community/whisper-tiny-mlx-q4"
         else:
             args.model = "tiny-int8" if is_arm else "base-int8"
         _LOGGER.info("Model automatically selected: %s", args.model)
@@ -111,31 +173,78 @@ async def main() -> None:
     # Resolve model name for faster-whisper
     model_name = args.model
     if args.backend == "faster-whisper":
-        match = re.match(r"^(tiny|base|small|medium)[.-]int8$", args.model)
-        if match:
-            model_size = match.group(1)
-            model_name = f"{model_size}-int8"
+        if args.model in _FASTER_WHISPER_MODELS:
+            model_name = _FASTER_WHISPER_MODELS[args.model]
             args.model = f"rhasspy/faster-whisper-{model_name}"
 
+    # Quantized weights are faster at about the same accuracy. CTranslate2
+    # falls back to a supported type if the device can't run these.
+    if args.compute_type == "default":
+        args.compute_type = "int8_float16" if "cuda" in args.device else "int8"
+        if args.backend == "faster-whisper":
+            _LOGGER.info("Compute type automatically selected: %s", args.compute_type)
+
     if args.language == "auto":
         args.language = None
 
+    # Some backends share global state (e.g. MLX's model and Metal device)
+    thread_safe = WhisperBackendFactory.get_backend_class(args.backend).thread_safe
+    if args.concurrency is None:
+        args.concurrency = 2 if thread_safe else 1
+    elif (args.concurrency > 1) and (not thread_safe):
+        _LOGGER.warning(
+            "%s backend can't transcribe concurrently, using --concurrency 1",
+            args.backend,
+        )
+        args.concurrency = 1
+
     # Create backend
     backend_kwargs = {
         'download_dir': args.download_dir,
         'device': args.device,
         'compute_type': args.compute_type,
+        'vad_filter': args.vad_filter,
+        'condition_on_previous_text': args.condition_on_previous_text,
+        'torch_features': args.torch_features,
+        'concurrency': max(1, args.concurrency),
+        'cpu_threads': args.cpu_threads,
+        'num_workers': args.num_workers,
     }
     
+    # Each concurrent transcription gets its own backend instance, but only
+    # the first one loads the model
+    backends: list[WhisperBackend] = []
     try:
-        whisper_backend = WhisperBackendFactory.create_backend(
-            args.backend, args.model, **backend_kwargs
+        backends.append(
+            WhisperBackendFactory.create_backend(
+                args.backend, args.model, **backend_kwargs
+            )
+        )
+        for _ in range(1, max(1, args.concurrency)):
+            backends.append(
+                WhisperBackendFactory.create_backend(
+                    args.backend,
+                    args.model,
+                    shared_instance=backends[0],
+                    **backend_kwargs,
+                )
+            )
+        _LOGGER.info(
+            "Loaded %s %s backend(s) with model %s",
+            len(backends),
+            args.backend,
+            args.model,
         )
-        _LOGGER.info("Loaded %s backend with model %s", args.backend, args.model)
     except Exception as e:
         _LOGGER.error("Failed to load backend %s: %s", args.backend, e)
         return
 
+    backend_pool: "asyncio.Queue[WhisperBackend]" = asyncio.Queue()
+    for backend in backends:
+        backend_pool.put_nowait(backend)
+
+    whisper_backend = backends[0]
+
     # Create Wyoming info
     wyoming_info = Info(
         asr=[
@@ -161,15 +270,22 @@ async def main() -> None:
 
     server = AsyncServer.from_uri(args.uri)
     _LOGGER.info("Ready")
-    model_lock = asyncio.Lock()
+    transcript_cache = None
+    if args.cache_size > 0:
+        transcript_cache = TranscriptCache(
+            max_size=args.cache_size, similarity=args.cache_similarity
+        )
+
     await server.run(
         partial(
             WhisperEventHandler,
             wyoming_info,
             args,
-            whisper_backend,
-            model_lock,
+            backend_pool,
             initial_prompt=args.initial_prompt,
+            transcript_cache=transcript_cache,
+            # Serialized once for all connections
+            wyoming_info_bytes=serialize_event(wyoming_info.event()),
         )
     )
 
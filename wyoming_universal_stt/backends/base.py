@@ -3,25 +3,75 @@
 Base Whisper backend implementation
 """
 import logging
+import os
+import struct
+import tempfile
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Iterator
+from typing import Any, Iterable, Optional, Union
 
+import numpy as np
 from wyoming.info import Attribution
 
 _LOGGER = logging.getLogger(__name__)
 
+_WAV_RATE = 16000
+_WAV_WIDTH = 2
+_WAV_CHANNELS = 1
+
+# Guards creation of the shared temporary directory
+_TEMP_DIR_LOCK = threading.Lock()
+
+
+def _wav_header(data_size: int) -> bytes:
+    """Return a 44-byte PCM WAV header for 16Khz 16-bit mono audio."""
+    byte_rate = _WAV_RATE * _WAV_WIDTH * _WAV_CHANNELS
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,  # fmt chunk size
+        1,  # PCM
+        _WAV_CHANNELS,
+        _WAV_RATE,
+        byte_rate,
+        _WAV_WIDTH * _WAV_CHANNELS,  # block align
+        _WAV_WIDTH * 8,  # bits per sample
+        b"data",
+        data_size,
+    )
+
 
 class WhisperBackend(ABC):
     """Abstract base class for Whisper backends."""
     
+    # True if transcribe(..., drain=False) yields segments while decoding
+    supports_streaming = False
+    
+    # True if instances may transcribe from several threads at once
+    thread_safe = False
+    
+    # Shared by all backends for the life of the process
+    _temp_dir: Optional[tempfile.TemporaryDirectory] = None
+    
     @abstractmethod
     def __init__(self, model_name: str, **kwargs):
-        """Initialize the backend with model and configuration."""
+        """Initialize the backend with model and configuration.
+
+        If shared_instance is passed, it's another backend of the same class
+        whose loaded model should be reused instead of loading a copy.
+        """
         pass
     
     @abstractmethod
-    def transcribe(self, audio_path: str, **kwargs) -> Iterator[Any]:
-        """Transcribe audio file and return segments."""
+    def transcribe(self, audio: Union[str, np.ndarray], **kwargs) -> Iterable[Any]:
+        """Transcribe audio and return segments.
+
+        Audio is either a path to an audio file or a float32 array of 16Khz
+        mono samples in [-1, 1]. Each segment must have a text: str attribute.
+        """
         pass
     
     @abstractmethod
@@ -37,4 +87,26 @@ class WhisperBackend(ABC):
     @abstractmethod
     def get_attribution(self) -> Attribution:
         """Return attribution information."""
-        pass 
\ No newline at end of file
+        pass
+
+    def _write_temp_wav(self, audio: np.ndarray) -> str:
+        """Write 16Khz mono float32 audio to a temporary WAV file.
+
+        Fallback for backends that can only transcribe from a file path. Each
+        backend instance has one file that is overwritten on every call.
+        """
+        if WhisperBackend._temp_dir is None:
+            # Concurrent first calls must not create (and later clean up) a
+            # second directory
+            with _TEMP_DIR_LOCK:
+                if WhisperBackend._temp_dir is None:
+                    WhisperBackend._temp_dir = tempfile.TemporaryDirectory()
+
+        wav_path = os.path.join(WhisperBackend._temp_dir.name, f"speech-{id(self)}.wav")
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+        with open(wav_path, "wb") as wav_io:
+            # Header is written once with the final sizes, no patching
+            wav_io.write(_wav_header(len(pcm)))
+            wav_io.write(pcm)
+
+        return wav_path
@@ -2,14 +2,13 @@
 """
 Factory for creating Whisper backends
 """
+import importlib
+import importlib.util
 import logging
 import platform
-from typing import Dict, Type
+from typing import Dict, Type, Union
 
 from .base import WhisperBackend
-from .faster_whisper import FasterWhisperBackend
-from .mlx_whisper import MLXWhisperBackend
-from .openai_whisper_api import OpenAIWhisperBackend
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,26 +16,38 @@ _LOGGER = logging.getLogger(__name__)
 class WhisperBackendFactory:
     """Factory for creating Whisper backends."""
     
-    _backends: Dict[str, Type[WhisperBackend]] = {
-        'faster-whisper': FasterWhisperBackend,
-        'mlx-whisper': MLXWhisperBackend,
-        'openai-whisper': OpenAIWhisperBackend,
+    # "module:class" strings are imported on first use, so unused backend
+    # modules are never loaded
+    _backends: Dict[str, Union[str, Type[WhisperBackend]]] = {
+        'faster-whisper': 'wyoming_universal_stt.backends.faster_whisper:FasterWhisperBackend',
+        'mlx-whisper': 'wyoming_universal_stt.backends.mlx_whisper:MLXWhisperBackend',
+        'openai-whisper': 'wyoming_universal_stt.backends.openai_whisper_api:OpenAIWhisperBackend',
     }
     
     @classmethod
-    def register_backend(cls, name: str, backend_class: Type[WhisperBackend]):
-        """Register a new backend."""
+    def register_backend(cls, name: str, backend_class: Union[str, Type[WhisperBackend]]):
+        """Register a new backend class or "module:class" import string."""
         cls._backends[name] = backend_class
     
     @classmethod
-    def create_backend(cls, backend_name: str, model_name: str, **kwargs) -> WhisperBackend:
-        """Create a backend instance."""
+    def get_backend_class(cls, backend_name: str) -> Type[WhisperBackend]:
+        """Get a backend class, importing its module if needed."""
         if backend_name not in cls._backends:
             available = ', '.join(cls._backends.keys())
             raise ValueError(f"Unknown backend '{backend_name}'. Available: {available}")
         
         backend_class = cls._backends[backend_name]
-        return backend_class(model_name, **kwargs)
+        if isinstance(backend_class, str):
+            module_name, class_name = backend_class.split(':', maxsplit=1)
+            backend_class = getattr(importlib.import_module(module_name), class_name)
+            cls._backends[backend_name] = backend_class
+        
+        return backend_class
+    
+    @classmethod
+    def create_backend(cls, backend_name: str, model_name: str, **kwargs) -> WhisperBackend:
+        """Create a backend instance."""
+        return cls.get_backend_class(backend_name)(model_name, **kwargs)
     
     @classmethod
     def get_available_backends(cls) -> list[str]:
@@ -49,24 +60,20 @@ def detect_optimal_backend() -> str:
     machine = platform.machine().lower()
     system = platform.system().lower()
     
+    # Only check that packages are installed; importing them pulls in heavy
+    # dependencies (torch, CTranslate2, MLX) that only the chosen backend needs
+    
     # Check for Apple Silicon
     if system == "darwin" and ("arm" in machine or "aarch" in machine):
-        try:
-            import mlx_whisper
+        if importlib.util.find_spec("mlx_whisper") is not None:
             return "mlx-whisper"
-        except ImportError:
-            pass
     
     # Check for faster-whisper
-    try:
-        import faster_whisper
+    if importlib.util.find_spec("faster_whisper") is not None:
         return "faster-whisper"
-    except ImportError:
-        pass
     
     # Fallback to OpenAI whisper
-    try:
-        import whisper
+    if importlib.util.find_spec("whisper") is not None:
         return "openai-whisper"
-    except ImportError:
-        raise ImportError("No Whisper backend available. Install one of: faster-whisper, mlx-whisper, or openai-whisper") 
\ No newline at end of file
+    
+    raise ImportError("No Whisper backend available. Install one of: faster-whisper, mlx-whisper, or openai-whisper")
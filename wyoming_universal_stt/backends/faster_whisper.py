@@ -3,45 +3,160 @@
 Faster-Whisper backend implementation
 """
 import logging
-from typing import Any, Iterator
+import os
+from functools import partial
+from typing import Any, Iterable, Optional, Union
 
+import numpy as np
 from wyoming.info import Attribution
 
+from ..features import log_mel_spectrogram, torch_device_available, torch_mel_tensors
 from .base import WhisperBackend
 
 _LOGGER = logging.getLogger(__name__)
 
+# faster-whisper's default temperature fallback schedule
+_DEFAULT_TEMPERATURE = [0.0, 0.2, 0.4, 0.6, 0.8, 1.0]
+
 
 class FasterWhisperBackend(WhisperBackend):
     """Faster-Whisper backend implementation."""
     
+    supports_streaming = True
+    thread_safe = True
+    
     def __init__(self, model_name: str, **kwargs):
         import faster_whisper
-        self.model = faster_whisper.WhisperModel(
-            model_name,
-            download_root=kwargs.get('download_dir'),
-            device=kwargs.get('device', 'cpu'),
-            compute_type=kwargs.get('compute_type', 'default'),
+        
+        # "default" keeps the model's stored type (often float32 on CPU),
+        # "auto" picks the fastest type the device supports. The CLI resolves
+        # "default" itself, so this only applies to direct library callers.
+        compute_type = kwargs.get('compute_type', 'default')
+        if compute_type == 'default':
+            compute_type = 'auto'
+        
+        device = kwargs.get('device', 'cpu')
+        shared_instance = kwargs.get('shared_instance')
+        if shared_instance is not None:
+            # CTranslate2 models are thread-safe, so pool slots share weights
+            self.model = shared_instance.model
+        else:
+            # 0 means automatic. The handler never runs more transcriptions
+            # at once than the pool has slots, so extra workers would sit idle.
+            requested_workers = kwargs.get('num_workers', 0)
+            num_workers = requested_workers
+            if num_workers <= 0:
+                num_workers = max(1, kwargs.get('concurrency', 1))
+            
+            # A single request gets every CPU this process may run on, at the
+            # cost of oversubscription when several run at once. CPUs are only
+            # split between workers when their number was set explicitly.
+            cpu_threads = kwargs.get('cpu_threads', 0)
+            if cpu_threads <= 0:
+                if 'OMP_NUM_THREADS' in os.environ:
+                    # CTranslate2 uses OMP_NUM_THREADS when cpu_threads is 0
+                    cpu_threads = 0
+                elif requested_workers > 0:
+                    cpu_threads = max(1, _available_cpus() // num_workers)
+                else:
+                    cpu_threads = _available_cpus()
+            
+            _LOGGER.debug("Using %s worker(s) with %s CPU thread(s) each", num_workers, cpu_threads)
+            self.model = faster_whisper.WhisperModel(
+                model_name,
+                download_root=kwargs.get('download_dir'),
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,
+                num_workers=num_workers,
+            )
+            
+            # Opt-in since importing torch slows down startup
+            if kwargs.get('torch_features', False):
+                if device.startswith('cuda') and torch_device_available(device):
+                    self.model.feature_extractor = _TorchFeatureExtractor(
+                        self.model.feature_extractor, device
+                    )
+                    _LOGGER.info("Computing log-Mel spectrograms with torch on %s", device)
+                else:
+                    _LOGGER.warning("Torch features need torch with CUDA, using CPU features")
+        
+        # Options that don't change between requests are bound once
+        self._do_transcribe = partial(
+            self.model.transcribe,
+            # Silero VAD skips silent regions instead of decoding them
+            vad_filter=kwargs.get('vad_filter', True),
+            vad_parameters={'min_silence_duration_ms': 500},
+            condition_on_previous_text=kwargs.get('condition_on_previous_text', False),
         )
-        self._faster_whisper = faster_whisper
+        self._languages = list(faster_whisper.tokenizer._LANGUAGE_CODES)
+        self._version = faster_whisper.__version__
     
-    def transcribe(self, audio_path: str, **kwargs) -> Iterator[Any]:
-        segments, _info = self.model.transcribe(
-            audio_path,
-            beam_size=kwargs.get('beam_size', 5),
+    def transcribe(self, audio: Union[str, np.ndarray], **kwargs) -> Iterable[Any]:
+        beam_size = kwargs.get('beam_size', 5)
+        
+        # CTranslate2 takes 16Khz float32 samples directly, skipping decoding
+        segments, _info = self._do_transcribe(
+            audio,
+            beam_size=beam_size,
             language=kwargs.get('language'),
             initial_prompt=kwargs.get('initial_prompt'),
+            # Greedy decoding without temperature fallback
+            temperature=0.0 if beam_size == 1 else _DEFAULT_TEMPERATURE,
         )
+        
+        # Segments are a lazy generator that drives decoding, so drain it here
+        # (in the caller's worker thread) unless streaming was requested
+        if kwargs.get('drain', True):
+            return list(segments)
+        
         return segments
     
     def get_supported_languages(self) -> list[str]:
-        return list(self._faster_whisper.tokenizer._LANGUAGE_CODES)
+        return self._languages
     
     def get_version(self) -> str:
-        return self._faster_whisper.__version__
+        return self._version
     
     def get_attribution(self) -> Attribution:
         return Attribution(
             name="Guillaume Klein",
             url="https://github.com/guillaumekln/faster-whisper/",
-        ) 
\ No newline at end of file
+        )
+
+
+def _available_cpus() -> int:
+    """Number of CPUs this process may run on (respects affinity and cpusets)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    
+    # Not available on Windows or macOS
+    return os.cpu_count() or 1
+
+
+class _TorchFeatureExtractor:
+    """Wraps faster-whisper's FeatureExtractor to compute spectrograms in torch."""
+    
+    def __init__(self, extractor: Any, device: str):
+        self._extractor = extractor
+        self._device = device
+        self._n_mels = extractor.mel_filters.shape[0]
+        
+        # Built once instead of uploaded for every window
+        self._torch_tensors = torch_mel_tensors(self._n_mels, device)
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._extractor, name)
+    
+    def __call__(self, waveform: np.ndarray, padding: int = 160, chunk_length: Optional[int] = None) -> np.ndarray:
+        if chunk_length is not None:
+            self._extractor.n_samples = chunk_length * self._extractor.sampling_rate
+            self._extractor.nb_max_frames = self._extractor.n_samples // self._extractor.hop_length
+        
+        return log_mel_spectrogram(
+            waveform.astype(np.float32, copy=False),
+            n_mels=self._n_mels,
+            padding=padding,
+            device=self._device,
+            torch_tensors=self._torch_tensors,
+        )
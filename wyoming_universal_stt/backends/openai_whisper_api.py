@@ -4,20 +4,33 @@ OpenAI Whisper API backend implementation
 """
 import logging
 import os
-from typing import Any, Iterator
+from typing import Any, Iterator, Union
 
+import numpy as np
 from wyoming.info import Attribution
 
 from .base import WhisperBackend
 
 _LOGGER = logging.getLogger(__name__)
 
+# OpenAI Whisper supports these languages
+_SUPPORTED_LANGUAGES = [
+    'af', 'am', 'ar', 'as', 'az', 'ba', 'be', 'bg', 'bn', 'bo', 'br', 'bs', 'ca', 'cs', 'cy', 'da', 'de', 'el',
+    'en', 'es', 'et', 'eu', 'fa', 'fi', 'fo', 'fr', 'gl', 'gu', 'ha', 'haw', 'he', 'hi', 'hr', 'ht', 'hu', 'hy',
+    'id', 'is', 'it', 'ja', 'jw', 'ka', 'kk', 'km', 'kn', 'ko', 'la', 'lb', 'ln', 'lo', 'lt', 'lv', 'mg', 'mi',
+    'mk', 'ml', 'mn', 'mr', 'ms', 'mt', 'my', 'ne', 'nl', 'nn', 'no', 'oc', 'pa', 'pl', 'ps', 'pt', 'ro', 'ru',
+    'sa', 'sd', 'si', 'sk', 'sl', 'sn', 'so', 'sq', 'sr', 'su', 'sv', 'sw', 'ta', 'te', 'tg', 'th', 'tk', 'tl',
+    'tr', 'tt', 'uk', 'ur', 'uz', 'vi', 'yi', 'yo', 'zh'
+]
 
 class OpenAIWhisperBackend(WhisperBackend):
     """OpenAI Whisper API backend implementation."""
     
+    thread_safe = True
+    
     def __init__(self, model_name: str, **kwargs):
         try:
+            import openai
             from openai import OpenAI
         except ImportError:
             raise ImportError("OpenAI package not installed. Install with: pip install openai")
@@ -29,22 +42,34 @@ class OpenAIWhisperBackend(WhisperBackend):
                 "OpenAI API key required. Set OPENAI_API_KEY environment variable or pass api_key parameter"
             )
         
-        self.client = OpenAI(api_key=api_key)
+        shared_instance = kwargs.get('shared_instance')
+        if shared_instance is not None:
+            # Reuse the HTTP connection pool
+            self.client = shared_instance.client
+        else:
+            self.client = OpenAI(api_key=api_key)
+        self._version = f"openai-api-{getattr(openai, '__version__', 'unknown')}"
         self.model_name = model_name
         
         # Validate model name
         valid_models = ['whisper-1']
         if model_name not in valid_models:
-            _LOGGER.warning(f"Model '{model_name}' not in known models {valid_models}. Using 'whisper-1'.")
+            _LOGGER.warning("Model '%s' not in known models %s. Using 'whisper-1'.", model_name, valid_models)
             self.model_name = 'whisper-1'
     
-    def transcribe(self, audio_path: str, **kwargs) -> Iterator[Any]:
+    def transcribe(self, audio: Union[str, np.ndarray], **kwargs) -> Iterator[Any]:
         """Transcribe audio using OpenAI API."""
         
         class Segment:
             def __init__(self, text: str):
                 self.text = text
         
+        # The API needs an uploaded file
+        if isinstance(audio, str):
+            audio_path = audio
+        else:
+            audio_path = self._write_temp_wav(audio)
+
         try:
             with open(audio_path, 'rb') as audio_file:
                 # Prepare transcription parameters
@@ -61,7 +86,7 @@ class OpenAIWhisperBackend(WhisperBackend):
                 if kwargs.get('initial_prompt'):
                     transcribe_kwargs['prompt'] = kwargs['initial_prompt']
                 
-                _LOGGER.debug(f"Transcribing with OpenAI API: {audio_path}")
+                _LOGGER.debug("Transcribing with OpenAI API: %s", audio_path)
                 response = self.client.audio.transcriptions.create(**transcribe_kwargs)
                 
                 # Handle response format
@@ -74,28 +99,16 @@ class OpenAIWhisperBackend(WhisperBackend):
                     yield Segment(response.text)
                     
         except Exception as e:
-            _LOGGER.error(f"OpenAI API transcription failed: {e}")
+            _LOGGER.error("OpenAI API transcription failed: %s", e)
             raise
     
     def get_supported_languages(self) -> list[str]:
         """Return supported languages for OpenAI Whisper API."""
-        # OpenAI Whisper supports these languages
-        return [
-            'af', 'am', 'ar', 'as', 'az', 'ba', 'be', 'bg', 'bn', 'bo', 'br', 'bs', 'ca', 'cs', 'cy', 'da', 'de', 'el',
-            'en', 'es', 'et', 'eu', 'fa', 'fi', 'fo', 'fr', 'gl', 'gu', 'ha', 'haw', 'he', 'hi', 'hr', 'ht', 'hu', 'hy',
-            'id', 'is', 'it', 'ja', 'jw', 'ka', 'kk', 'km', 'kn', 'ko', 'la', 'lb', 'ln', 'lo', 'lt', 'lv', 'mg', 'mi',
-            'mk', 'ml', 'mn', 'mr', 'ms', 'mt', 'my', 'ne', 'nl', 'nn', 'no', 'oc', 'pa', 'pl', 'ps', 'pt', 'ro', 'ru',
-            'sa', 'sd', 'si', 'sk', 'sl', 'sn', 'so', 'sq', 'sr', 'su', 'sv', 'sw', 'ta', 'te', 'tg', 'th', 'tk', 'tl',
-            'tr', 'tt', 'uk', 'ur', 'uz', 'vi', 'yi', 'yo', 'zh'
-        ]
+        return _SUPPORTED_LANGUAGES
     
     def get_version(self) -> str:
         """Return OpenAI API version."""
-        try:
-            import openai
-            return f"openai-api-{openai.__version__}"
-        except:
-            return "openai-api-unknown"
+        return self._version
     
     def get_attribution(self) -> Attribution:
         return Attribution(
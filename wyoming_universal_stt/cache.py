@@ -0,0 +1,203 @@
+"""Cache of transcripts keyed by audio fingerprints."""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .features import N_FFT, log_mel_spectrogram
+
+_LOGGER = logging.getLogger(__name__)
+
+_N_MELS = 80
+_N_MFCC = 13
+
+# Number of time steps every fingerprint is resampled to
+_N_STEPS = 64
+
+# In Whisper's log-Mel scale, 1.0 is 40 dB.
+# Frames with this much less energy than the loudest frame count as silence.
+_SILENCE_DEPTH = 1.0
+
+# Quieter values are clamped so background noise doesn't dominate (40 dB)
+_DYNAMIC_RANGE = 1.0
+
+# Approximate matches must have a similar duration
+_MAX_DURATION_RATIO = 1.2
+
+
+@dataclass
+class CacheKey:
+    """Exact and approximate keys for one utterance."""
+
+    digest: bytes
+    language: Optional[str]
+    fingerprint: Optional[np.ndarray] = None
+    voiced_frames: int = 0
+
+
+@dataclass
+class _CacheEntry:
+    key: CacheKey
+    text: str
+
+
+class TranscriptCache:
+    """LRU cache of transcripts for repeated utterances.
+
+    Audio is first looked up by a hash of its PCM bytes. If similarity is
+    set, a miss falls back to comparing a quantized MFCC fingerprint against
+    the cached entries, and the transcript of the most similar one is used
+    if its cosine similarity reaches the threshold.
+
+    Fingerprinting is CPU-bound, so get_similar() is meant to be called from
+    a worker thread; all methods are thread-safe.
+    """
+
+    def __init__(self, max_size: int = 256, similarity: float = 0.0) -> None:
+        self.max_size = max_size
+        self.similarity = similarity
+        self._entries: "OrderedDict[bytes, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def make_key(self, pcm: bytes, language: Optional[str]) -> CacheKey:
+        """Compute the exact cache key for 16-bit PCM."""
+        hasher = hashlib.blake2b(pcm, digest_size=16)
+        hasher.update((language or "").encode("utf-8"))
+
+        return CacheKey(digest=hasher.digest(), language=language)
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        """Return the transcript cached for exactly the same audio or None."""
+        with self._lock:
+            entry = self._entries.get(key.digest)
+            if entry is None:
+                return None
+
+            _LOGGER.debug("Exact cache hit")
+            self._entries.move_to_end(key.digest)
+            return entry.text
+
+    def get_similar(self, key: CacheKey, audio: np.ndarray) -> Optional[str]:
+        """Return the transcript of similar audio or None.
+
+        Fingerprints the float32 samples of the key's audio, storing the
+        fingerprint in the key for put().
+        """
+        if self.similarity <= 0:
+            return None
+
+        if key.fingerprint is None:
+            result = audio_fingerprint(audio)
+            if result is None:
+                return None
+
+            key.fingerprint, key.voiced_frames = result
+
+        with self._lock:
+            entry = self._find_similar(key)
+            if entry is None:
+                return None
+
+            self._entries.move_to_end(entry.key.digest)
+            return entry.text
+
+    def put(self, key: CacheKey, text: str) -> None:
+        """Cache a transcript, evicting the least recently used entry."""
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key.digest] = _CacheEntry(key=key, text=text)
+            self._entries.move_to_end(key.digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _find_similar(self, key: CacheKey) -> Optional[_CacheEntry]:
+        assert key.fingerprint is not None
+        query = key.fingerprint.astype(np.float32)
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return None
+
+        best_entry: Optional[_CacheEntry] = None
+        best_similarity = self.similarity
+        for entry in self._entries.values():
+            other = entry.key
+            if (other.fingerprint is None) or (other.language != key.language):
+                continue
+
+            longest = max(other.voiced_frames, key.voiced_frames)
+            shortest = min(other.voiced_frames, key.voiced_frames)
+            if longest > shortest * _MAX_DURATION_RATIO:
+                continue
+
+            candidate = other.fingerprint.astype(np.float32)
+            candidate_norm = np.linalg.norm(candidate)
+            if candidate_norm == 0:
+                continue
+
+            similarity = float(np.dot(query, candidate) / (query_norm * candidate_norm))
+            if similarity >= best_similarity:
+                best_entry = entry
+                best_similarity = similarity
+
+        if best_entry is not None:
+            _LOGGER.debug("Approximate cache hit (similarity=%.3f)", best_similarity)
+
+        return best_entry
+
+
+def audio_fingerprint(audio: np.ndarray) -> Optional[Tuple[np.ndarray, int]]:
+    """Fingerprint 16Khz float32 audio.
+
+    Returns an int8 vector and the number of voiced frames, or None if the
+    audio is too short or silent.
+    """
+    if len(audio) < N_FFT:
+        return None
+
+    # (frames, mels)
+    log_mel = log_mel_spectrogram(audio, n_mels=_N_MELS).T
+
+    # Trim leading/trailing silence so alignment doesn't matter.
+    # Total frame energy keeps broadband consonants (e.g. a final "s") that
+    # are quiet in every single band.
+    frame_energy = np.log10(np.sum(10.0 ** (log_mel * 4.0 - 4.0), axis=1)) / 4.0
+    voiced = np.flatnonzero(frame_energy > frame_energy.max() - _SILENCE_DEPTH)
+    log_mel = log_mel[voiced[0] : voiced[-1] + 1]
+    log_mel = np.maximum(log_mel, log_mel.max() - _DYNAMIC_RANGE)
+    mfcc = log_mel @ _dct_matrix().T
+
+    # Cepstral mean normalization removes gain and channel differences
+    mfcc -= mfcc.mean(axis=0)
+
+    # Resample to a fixed number of time steps
+    steps = np.linspace(0, len(mfcc) - 1, _N_STEPS)
+    positions = np.arange(len(mfcc))
+    resampled = np.stack(
+        [np.interp(steps, positions, mfcc[:, i]) for i in range(_N_MFCC)], axis=1
+    )
+
+    vector = resampled.ravel()
+    norm = np.linalg.norm(vector)
+    if norm < 1e-3:
+        # Constant signal
+        return None
+
+    return np.round((vector / norm) * 127).astype(np.int8), len(mfcc)
+
+
+@lru_cache(maxsize=None)
+def _dct_matrix() -> np.ndarray:
+    """Orthonormal DCT-II matrix with shape (n_mfcc, n_mels)."""
+    n = np.arange(_N_MELS)
+    k = np.arange(_N_MFCC)[:, np.newaxis]
+    dct = np.cos(np.pi * k * (2 * n + 1) / (2 * _N_MELS)) * np.sqrt(2.0 / _N_MELS)
+    dct[0] /= np.sqrt(2.0)
+
+    return dct.astype(np.float32)
@@ -0,0 +1,124 @@
+"""Log-Mel spectrogram features matching Whisper's preprocessing."""
+from functools import lru_cache
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+N_FFT = 400
+HOP_LENGTH = 160
+
+
+def log_mel_spectrogram(
+    audio: np.ndarray,
+    n_mels: int = 80,
+    padding: int = 0,
+    device: Optional[str] = None,
+    torch_tensors: Optional[Tuple[Any, Any]] = None,
+) -> np.ndarray:
+    """Compute Whisper's log-Mel spectrogram of 16Khz float32 audio.
+
+    Returns an array with shape (n_mels, n_frames). When device is set (e.g.
+    "cuda"), the STFT runs in torch on that device; otherwise numpy is used.
+    Pass torch_tensors from torch_mel_tensors() to avoid rebuilding them.
+    """
+    if padding > 0:
+        audio = np.pad(audio, (0, padding))
+
+    if device is not None:
+        if torch_tensors is None:
+            torch_tensors = torch_mel_tensors(n_mels, device)
+
+        return _torch_log_mel_spectrogram(audio, device, *torch_tensors)
+
+    # Same framing as torch.stft(center=True)
+    padded = np.pad(audio, N_FFT // 2, mode="reflect")
+    frames = np.lib.stride_tricks.sliding_window_view(padded, N_FFT)[::HOP_LENGTH]
+    stft = np.fft.rfft(frames * _hann_window(), axis=1)
+
+    # Last frame is dropped, as in Whisper
+    magnitudes = np.abs(stft[:-1].T) ** 2
+    mel_spec = mel_filters(n_mels) @ magnitudes
+
+    log_spec = np.log10(np.maximum(mel_spec, 1e-10))
+    log_spec = np.maximum(log_spec, log_spec.max() - 8.0)
+    return ((log_spec + 4.0) / 4.0).astype(np.float32)
+
+
+def torch_device_available(device: str) -> bool:
+    """True if torch is installed and can run on device."""
+    try:
+        import torch
+    except ImportError:
+        return False
+
+    if device.startswith("cuda"):
+        return bool(torch.cuda.is_available())
+
+    return True
+
+
+def torch_mel_tensors(n_mels: int, device: str) -> Tuple[Any, Any]:
+    """Hann window and mel filterbank as torch tensors on device."""
+    import torch
+
+    window = torch.hann_window(N_FFT, device=device)
+    filters = torch.from_numpy(mel_filters(n_mels)).to(device)
+
+    return window, filters
+
+
+@lru_cache(maxsize=None)
+def mel_filters(n_mels: int) -> np.ndarray:
+    """Slaney-style mel filterbank with shape (n_mels, N_FFT // 2 + 1).
+
+    Equivalent to librosa.filters.mel(sr=16000, n_fft=400, n_mels=n_mels),
+    which Whisper uses.
+    """
+    fft_freqs = np.fft.rfftfreq(n=N_FFT, d=1.0 / SAMPLE_RATE)
+
+    # Linear below 1Khz, logarithmic above
+    f_sp = 200.0 / 3
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+
+    max_mel = min_log_mel + np.log((SAMPLE_RATE / 2) / min_log_hz) / logstep
+    mels = np.linspace(0.0, max_mel, n_mels + 2)
+    freqs = f_sp * mels
+    log_region = mels >= min_log_mel
+    freqs[log_region] = min_log_hz * np.exp(logstep * (mels[log_region] - min_log_mel))
+
+    fdiff = np.diff(freqs)
+    ramps = freqs[:, np.newaxis] - fft_freqs[np.newaxis, :]
+    lower = -ramps[:-2] / fdiff[:-1, np.newaxis]
+    upper = ramps[2:] / fdiff[1:, np.newaxis]
+    weights = np.maximum(0.0, np.minimum(lower, upper))
+
+    # Approximately constant energy per channel
+    enorm = 2.0 / (freqs[2 : n_mels + 2] - freqs[:n_mels])
+    weights *= enorm[:, np.newaxis]
+
+    return weights.astype(np.float32)
+
+
+@lru_cache(maxsize=None)
+def _hann_window() -> np.ndarray:
+    return np.hanning(N_FFT + 1)[:-1].astype(np.float32)
+
+
+def _torch_log_mel_spectrogram(
+    audio: np.ndarray, device: str, window: Any, filters: Any
+) -> np.ndarray:
+    import torch
+
+    samples = torch.from_numpy(np.ascontiguousarray(audio, dtype=np.float32)).to(
+        device
+    )
+    stft = torch.stft(samples, N_FFT, HOP_LENGTH, window=window, return_complex=True)
+    magnitudes = stft[..., :-1].abs() ** 2
+    mel_spec = filters @ magnitudes
+
+    log_spec = torch.clamp(mel_spec, min=1e-10).log10()
+    log_spec = torch.maximum(log_spec, log_spec.max() - 8.0)
+    return ((log_spec + 4.0) / 4.0).cpu().numpy()
@@ -1,22 +1,39 @@
 """Event handler for clients of the modular whisper server."""
 import argparse
 import asyncio
+import io
 import logging
-import os
-import tempfile
-import wave
-from typing import Optional
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 from wyoming.asr import Transcribe, Transcript
-from wyoming.audio import AudioChunk, AudioStop
-from wyoming.event import Event
+from wyoming.audio import AudioChunk, AudioChunkConverter, AudioStop
+from wyoming.event import Event, write_event
 from wyoming.info import Describe, Info
 from wyoming.server import AsyncEventHandler
 
 from .backends import WhisperBackend
+from .cache import CacheKey, TranscriptCache
 
 _LOGGER = logging.getLogger(__name__)
 
+_RATE = 16000
+_WIDTH = 2
+_CHANNELS = 1
+
+_AUDIO_CHUNK_TYPE = AudioChunk(rate=_RATE, width=_WIDTH, channels=_CHANNELS, audio=bytes()).event().type
+_AUDIO_STOP_TYPE = AudioStop().event().type
+_TRANSCRIBE_TYPE = Transcribe().event().type
+_DESCRIBE_TYPE = Describe().event().type
+
+
+def serialize_event(event: Event) -> bytes:
+    """Serialize an event to its Wyoming wire format."""
+    with io.BytesIO() as event_io:
+        write_event(event, event_io)
+        return event_io.getvalue()
+
 
 class WhisperEventHandler(AsyncEventHandler):
     """Event handler for clients using modular whisper backends."""
@@ -25,105 +42,246 @@ class WhisperEventHandler(AsyncEventHandler):
         self,
         wyoming_info: Info,
         cli_args: argparse.Namespace,
-        backend: WhisperBackend,
-        model_lock: asyncio.Lock,
+        backend_pool: "asyncio.Queue[WhisperBackend]",
         *args,
         initial_prompt: Optional[str] = None,
+        transcript_cache: Optional[TranscriptCache] = None,
+        wyoming_info_bytes: Optional[bytes] = None,
         **kwargs,
     ) -> None:
         super().__init__(*args, **kwargs)
         self.cli_args = cli_args
-        self.wyoming_info_event = wyoming_info.event()
-        self.backend = backend
-        self.model_lock = model_lock
+        if wyoming_info_bytes is None:
+            wyoming_info_bytes = serialize_event(wyoming_info.event())
+
+        self.wyoming_info_bytes = wyoming_info_bytes
+        self.backend_pool = backend_pool
         self.initial_prompt = initial_prompt
+        self.transcript_cache = transcript_cache
         self._language = self.cli_args.language
-        self._wav_dir = tempfile.TemporaryDirectory()
-        self._wav_path = os.path.join(self._wav_dir.name, "speech.wav")
-        self._wav_file: Optional[wave.Wave_write] = None
+        self._pcm = bytearray()
+        self._audio_converter: Optional[AudioChunkConverter] = None
+
+        # Options that don't change between requests are bound once
+        transcription_kwargs: Dict[str, Any] = {'initial_prompt': self.initial_prompt}
+        if hasattr(self.cli_args, 'beam_size'):
+            transcription_kwargs['beam_size'] = self.cli_args.beam_size
+
+        self._transcribe = partial(self._run_transcribe, **transcription_kwargs)
+        self._streaming = getattr(self.cli_args, 'stream', False)
+
+        # Set once a partial transcript was sent for the current request
+        self._streamed = False
+
+        # Resolved once so each event is a single dict lookup
+        self._dispatch: Dict[str, Callable[[Event], Awaitable[bool]]] = {
+            _AUDIO_CHUNK_TYPE: self._handle_chunk,
+            _AUDIO_STOP_TYPE: self._handle_stop,
+            _TRANSCRIBE_TYPE: self._handle_transcribe,
+            _DESCRIBE_TYPE: self._handle_describe,
+        }
 
     async def handle_event(self, event: Event) -> bool:
-        if AudioChunk.is_type(event.type):
-            chunk = AudioChunk.from_event(event)
-            if self._wav_file is None:
-                _LOGGER.debug(f"Starting new audio recording: rate={chunk.rate}, width={chunk.width}, channels={chunk.channels}")
-                self._wav_file = wave.open(self._wav_path, "wb")
-                self._wav_file.setframerate(chunk.rate)
-                self._wav_file.setsampwidth(chunk.width)
-                self._wav_file.setnchannels(chunk.channels)
-            self._wav_file.writeframes(chunk.audio)
+        handler = self._dispatch.get(event.type)
+        if handler is None:
             return True
 
-        if AudioStop.is_type(event.type):
+        return await handler(event)
+
+    async def _handle_chunk(self, event: Event) -> bool:
+        chunk = AudioChunk.from_event(event)
+        if self._audio_converter is None:
             _LOGGER.debug(
-                "Audio stopped. Transcribing with initial prompt=%s",
-                self.initial_prompt,
+                "Starting new audio recording: rate=%s, width=%s, channels=%s",
+                chunk.rate,
+                chunk.width,
+                chunk.channels,
+            )
+            # Whisper expects 16Khz mono audio
+            self._audio_converter = AudioChunkConverter(
+                rate=_RATE, width=_WIDTH, channels=_CHANNELS
             )
-            assert self._wav_file is not None
-            self._wav_file.close()
+        chunk = self._audio_converter.convert(chunk)
+        self._pcm.extend(chunk.audio)
+        return True
+
+    async def _handle_stop(self, event: Event) -> bool:
+        _LOGGER.debug(
+            "Audio stopped. Transcribing with initial prompt=%s",
+            self.initial_prompt,
+        )
+        assert self._audio_converter is not None
+        _LOGGER.debug("Audio buffered: %s bytes", len(self._pcm))
+
+        # int16 PCM -> float32 in [-1, 1]
+        pcm = self._pcm
+        audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        self._pcm = bytearray()
+        self._audio_converter = None
+
+        text: Optional[str] = None
+        cache_key: Optional[CacheKey] = None
+        if self.transcript_cache is not None:
+            # Repeated commands skip the model entirely
+            cache_key = self.transcript_cache.make_key(pcm, self._language)
+            text = self.transcript_cache.get(cache_key)
+            if (text is None) and (self.transcript_cache.similarity > 0):
+                # Fingerprinting runs an STFT, so keep it off the event loop
+                text = await asyncio.to_thread(
+                    self.transcript_cache.get_similar, cache_key, audio
+                )
+
+            if text is not None:
+                _LOGGER.info("Cached transcription result: '%s'", text)
+
+        streamed = False
+        if text is None:
+            text, streamed = await self._transcribe_audio(audio)
+            if (self.transcript_cache is not None) and (cache_key is not None) and text:
+                self.transcript_cache.put(cache_key, text)
+
+        if not streamed:
+            await self.write_event(Transcript(text=text).event())
+
+        _LOGGER.debug("Completed request")
+
+        # Reset
+        self._language = self.cli_args.language
+
+        return False
+
+    async def _transcribe_audio(self, audio: np.ndarray) -> Tuple[str, bool]:
+        """Transcribe audio with a backend from the pool.
+
+        Returns the text and whether it was already sent as partial
+        transcripts.
+        """
+        self._streamed = False
+
+        # Wait for a free backend
+        backend = await self.backend_pool.get()
+        try:
+            _LOGGER.debug(
+                "Starting transcription with language=%s, options=%s",
+                self._language,
+                self._transcribe.keywords,
+            )
+
+            if self._streaming and backend.supports_streaming:
+                segments = await self._stream_transcribe(backend, audio)
+            else:
+                # Decode in a worker thread so the event loop keeps serving other clients
+                transcribe_task = asyncio.ensure_future(
+                    asyncio.to_thread(
+                        self._transcribe, backend, audio, language=self._language
+                    )
+                )
+                try:
+                    # Shielded so cancellation doesn't mark the task done early
+                    segments = await asyncio.shield(transcribe_task)
+                except BaseException:
+                    # Backend can't go back to the pool while it's still decoding
+                    await asyncio.wait([transcribe_task])
+                    raise
             
-            import os
-            file_size = os.path.getsize(self._wav_path)
-            _LOGGER.debug(f"Audio file saved: {self._wav_path}, size: {file_size} bytes")
+            text = " ".join(
+                segment_text
+                for segment_text in (segment.text.strip() for segment in segments)
+                if segment_text
+            )
+            _LOGGER.info(
+                "Final transcription result: '%s' (from %s segments)",
+                text,
+                len(segments),
+            )
             
-            self._wav_file = None
-
-            async with self.model_lock:
-                transcription_kwargs = {
-                    'language': self._language,
-                    'initial_prompt': self.initial_prompt,
-                }
-                
-                # Add backend-specific parameters
-                if hasattr(self.cli_args, 'beam_size'):
-                    transcription_kwargs['beam_size'] = self.cli_args.beam_size
-                
-                try:
-                    _LOGGER.debug(f"Starting transcription with kwargs: {transcription_kwargs}")
-                    segments = self.backend.transcribe(
-                        self._wav_path, 
-                        **transcription_kwargs
-                    )
-                    
-                    # Collect all segments
-                    segment_texts = []
-                    for segment in segments:
-                        if hasattr(segment, 'text') and segment.text:
-                            segment_text = segment.text.strip()
-                            if segment_text:
-                                segment_texts.append(segment_text)
-                                _LOGGER.debug(f"Got segment: '{segment_text}'")
-                    
-                    text = " ".join(segment_texts)
-                    _LOGGER.info(f"Final transcription result: '{text}' (from {len(segment_texts)} segments)")
-                    
-                except Exception as e:
-                    _LOGGER.error(f"Transcription failed: {e}", exc_info=True)
-                    text = ""
+        except Exception as e:
+            _LOGGER.error("Transcription failed: %s", e, exc_info=True)
+            text = ""
+        finally:
+            self.backend_pool.put_nowait(backend)
 
-            await self.write_event(Transcript(text=text).event())
-            _LOGGER.debug("Completed request")
+        # Even if transcription failed, partial transcripts may have been sent
+        return text, self._streamed
 
-            # Reset
-            self._language = self.cli_args.language
+    async def _stream_transcribe(
+        self, backend: WhisperBackend, audio: np.ndarray
+    ) -> List[Any]:
+        """Transcribe in a worker thread, sending each segment as it's decoded.
 
-            return False
+        Returns all segments. Sets _streamed once a partial transcript is sent.
+        """
+        loop = asyncio.get_running_loop()
+        segment_queue: "asyncio.Queue[Optional[Any]]" = asyncio.Queue()
 
-        if Transcribe.is_type(event.type):
-            transcribe = Transcribe.from_event(event)
-            if transcribe.language:
-                self._language = transcribe.language
-                _LOGGER.debug("Language set to %s", transcribe.language)
-            return True
+        def on_segment(segment: Any) -> None:
+            loop.call_soon_threadsafe(segment_queue.put_nowait, segment)
 
-        if Describe.is_type(event.type):
-            await self.write_event(self.wyoming_info_event)
-            _LOGGER.debug("Sent info")
-            return True
+        transcribe_task = asyncio.ensure_future(
+            asyncio.to_thread(
+                self._transcribe,
+                backend,
+                audio,
+                on_segment=on_segment,
+                language=self._language,
+            )
+        )
+        transcribe_task.add_done_callback(lambda _task: segment_queue.put_nowait(None))
+
+        try:
+            while True:
+                segment = await segment_queue.get()
+                if segment is None:
+                    break
+
+                segment_text = segment.text.strip()
+                if segment_text:
+                    await self.write_event(Transcript(text=segment_text).event())
+                    self._streamed = True
+        except BaseException:
+            # Backend can't go back to the pool while it's still decoding
+            await asyncio.wait([transcribe_task])
+            raise
+
+        return await transcribe_task
+
+    def _run_transcribe(
+        self,
+        backend: WhisperBackend,
+        audio: np.ndarray,
+        on_segment: Optional[Callable[[Any], None]] = None,
+        **kwargs: Any,
+    ) -> List[Any]:
+        """Run a transcription to completion (called from a worker thread).
+
+        Backends may return lazy generators, so segments are drained here
+        rather than on the event loop. If on_segment is set, it's called with
+        each segment as soon as the backend produces it.
+        """
+        if on_segment is None:
+            segments = backend.transcribe(audio, **kwargs)
+            if isinstance(segments, list):
+                return segments
+
+            return list(segments)
 
+        segment_list = []
+        for segment in backend.transcribe(audio, drain=False, **kwargs):
+            on_segment(segment)
+            segment_list.append(segment)
+
+        return segment_list
+
+    async def _handle_transcribe(self, event: Event) -> bool:
+        transcribe = Transcribe.from_event(event)
+        if transcribe.language:
+            self._language = transcribe.language
+            _LOGGER.debug("Language set to %s", transcribe.language)
         return True
 
-    def __del__(self):
-        """Cleanup temporary directory."""
-        if hasattr(self, '_wav_dir'):
-            self._wav_dir.cleanup()
\ No newline at end of file
+    async def _handle_describe(self, event: Event) -> bool:
+        # Pre-serialized, so skip async_write_event's JSON encoding
+        self.writer.write(self.wyoming_info_bytes)
+        await self.writer.drain()
+        _LOGGER.debug("Sent info")
+        return True